@@ -157,8 +157,9 @@ def main(opcode_py, outfile='Include/opcode.h', internaloutfile='Include/interna
 
         fobj.write("\n")
         fobj.write("#define HAS_ARG(op) ((((op) >= HAVE_ARGUMENT) && (!IS_PSEUDO_OPCODE(op)))\\")
+        hasarg_set = set(hasarg)
         for op in _pseudo_ops:
-            if opmap[op] in hasarg:
+            if opmap[op] in hasarg_set:
                 fobj.write(f"\n    || ((op) == {op}) \\")
         fobj.write("\n    )\n")
 
@@ -29,7 +29,10 @@
 RE_PREDICTED = (
     r"^\s*(?:PREDICT\(|GO_TO_INSTRUCTION\(|DEOPT_IF\(.*?,\s*)(\w+)\);\s*(?://.*)?$"
 )
+# Any line matching RE_PREDICTED starts (after whitespace) with one of these
+PREDICTED_PREFIXES = ("PREDICT(", "GO_TO_INSTRUCTION(", "DEOPT_IF(")
 UNUSED = "unused"
+NEVER_DECREFED = frozenset({UNUSED, "null"})
 BITS_PER_CODE_UNIT = 16
 
 arg_parser = argparse.ArgumentParser(
@@ -89,6 +92,24 @@ def list_effect_size(effects: list[StackEffect]) -> tuple[int, str]:
     return numeric, " + ".join(symbolic)
 
 
+def cumulative_effect_sizes(effects: list[StackEffect]) -> list[str]:
+    """Return the string size of each prefix of a list of effects.
+
+    Element i is string_effect_size(list_effect_size(effects[: i + 1])),
+    but the sizes are accumulated in a single pass.
+    """
+    sizes: list[str] = []
+    numeric = 0
+    symbolic: list[str] = []
+    for effect in effects:
+        diff, sym = effect_size(effect)
+        numeric += diff
+        if sym:
+            symbolic.append(maybe_parenthesize(sym))
+        sizes.append(string_effect_size((numeric, " + ".join(symbolic))))
+    return sizes
+
+
 def string_effect_size(arg: tuple[int, str]) -> str:
     numeric, symbolic = arg
     if numeric and symbolic:
@@ -171,15 +192,21 @@ def assign(self, dst: StackEffect, src: StackEffect):
         if src.name == UNUSED:
             return
         cast = self.cast(dst, src)
-        if m := re.match(r"^PEEK\((.*)\)$", dst.name):
-            stmt = f"POKE({m.group(1)}, {cast}{src.name});"
+        # Plain string tests; dst.name is one of a few fixed shapes
+        name = dst.name
+        if name.startswith("PEEK(") and name.endswith(")"):
+            stmt = f"POKE({name[5:-1]}, {cast}{src.name});"
             if src.cond:
                 stmt = f"if ({src.cond}) {{ {stmt} }}"
             self.emit(stmt)
-        elif m := re.match(r"^&PEEK\(.*\)$", dst.name):
+        elif name.startswith("&PEEK(") and name.endswith(")"):
             # The user code is responsible for writing to the output array.
             pass
-        elif m := re.match(r"^REG\(oparg(\d+)\)$", dst.name):
+        elif (
+            name.startswith("REG(oparg")
+            and name.endswith(")")
+            and name[9:-1].isdecimal()
+        ):
             self.emit(f"Py_XSETREF({dst.name}, {cast}{src.name});")
         else:
             self.emit(f"{dst.name} = {cast}{src.name};")
@@ -188,7 +215,7 @@ def cast(self, dst: StackEffect, src: StackEffect) -> str:
         return f"({dst.type or 'PyObject *'})" if src.type != dst.type else ""
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Instruction:
     """An instruction with additional data and code."""
 
@@ -200,6 +227,7 @@ class Instruction:
     block: parser.Block
     block_text: list[str]  # Block.text, less curlies, less PREDICT() calls
     predictions: list[str]  # Prediction targets (instruction names)
+    check_eval_breaker: bool  # Block ended in CHECK_EVAL_BREAKER()
 
     # Computed by constructor
     always_exits: bool
@@ -208,6 +236,8 @@ class Instruction:
     input_effects: list[StackEffect]
     output_effects: list[StackEffect]
     unmoved_names: frozenset[str]
+    error_pop: tuple[int, str]  # Inputs popped by ERROR_IF(), as list_effect_size()
+    decref_effects: list[StackEffect]  # Inputs released by DECREF_INPUTS()
     instr_fmt: str
 
     # Parallel to input_effects; set later
@@ -226,14 +256,18 @@ def __init__(self, inst: parser.InstDef):
         self.block = inst.block
         self.block_text, self.check_eval_breaker, self.predictions = \
             extract_block_text(self.block)
+        self.family = None
+        self.predicted = False
         self.always_exits = always_exits(self.block_text)
-        self.cache_effects = [
-            effect for effect in inst.inputs if isinstance(effect, parser.CacheEffect)
-        ]
+        # Split the inputs into cache and stack effects in a single pass
+        self.cache_effects = []
+        self.input_effects = []
+        for effect in inst.inputs:
+            if isinstance(effect, parser.CacheEffect):
+                self.cache_effects.append(effect)
+            elif isinstance(effect, StackEffect):
+                self.input_effects.append(effect)
         self.cache_offset = sum(c.size for c in self.cache_effects)
-        self.input_effects = [
-            effect for effect in inst.inputs if isinstance(effect, StackEffect)
-        ]
         self.output_effects = inst.outputs  # For consistency/completeness
         unmoved_names: set[str] = set()
         for ieffect, oeffect in zip(self.input_effects, self.output_effects):
@@ -242,6 +276,22 @@ def __init__(self, inst: parser.InstDef):
             else:
                 break
         self.unmoved_names = frozenset(unmoved_names)
+        names_to_skip = self.unmoved_names | NEVER_DECREFED
+        self.decref_effects = [
+            ieff for ieff in self.input_effects if ieff.name not in names_to_skip
+        ]
+        if self.register:
+            self.error_pop = (0, "")
+        else:
+            # Don't pop common input/output effects at the bottom!
+            # These aren't DECREF'ed so they can stay.
+            ieffs = self.input_effects
+            oeffs = self.output_effects
+            ncommon = 0
+            limit = min(len(ieffs), len(oeffs))
+            while ncommon < limit and ieffs[ncommon] == oeffs[ncommon]:
+                ncommon += 1
+            self.error_pop = list_effect_size(ieffs[ncommon:])
         if self.register:
             num_regs = len(self.input_effects) + len(self.output_effects)
             num_dummies = (num_regs // 2) * 2 + 1 - num_regs
@@ -259,18 +309,16 @@ def __init__(self, inst: parser.InstDef):
         self.instr_fmt = fmt
 
     def analyze_registers(self, a: "Analyzer") -> None:
-        regs = iter(("REG(oparg1)", "REG(oparg2)", "REG(oparg3)"))
-        try:
-            self.input_registers = [
-                next(regs) for ieff in self.input_effects if ieff.name != UNUSED
-            ]
-            self.output_registers = [
-                next(regs) for oeff in self.output_effects if oeff.name != UNUSED
-            ]
-        except StopIteration:  # Running out of registers
+        regs = ("REG(oparg1)", "REG(oparg2)", "REG(oparg3)")
+        ninputs = sum(ieff.name != UNUSED for ieff in self.input_effects)
+        noutputs = sum(oeff.name != UNUSED for oeff in self.output_effects)
+        if ninputs + noutputs > len(regs):  # Running out of registers
             a.error(
                 f"Instruction {self.name} has too many register effects", node=self.inst
             )
+            return
+        self.input_registers = list(regs[:ninputs])
+        self.output_registers = list(regs[ninputs : ninputs + noutputs])
 
     def write(self, out: Formatter) -> None:
         """Write one instruction, sans prologue and epilogue."""
@@ -286,10 +334,7 @@ def write(self, out: Formatter) -> None:
         if not self.register:
             # Write input stack effect variable declarations and initializations
             ieffects = list(reversed(self.input_effects))
-            for i, ieffect in enumerate(ieffects):
-                isize = string_effect_size(
-                    list_effect_size([ieff for ieff in ieffects[: i + 1]])
-                )
+            for ieffect, isize in zip(ieffects, cumulative_effect_sizes(ieffects)):
                 if ieffect.size:
                     src = StackEffect(f"&PEEK({isize})", "PyObject **")
                 elif ieffect.cond:
@@ -306,12 +351,11 @@ def write(self, out: Formatter) -> None:
         # Write output stack effect variable declarations
         isize = string_effect_size(list_effect_size(self.input_effects))
         input_names = {ieffect.name for ieffect in self.input_effects}
+        osizes = ["0", *cumulative_effect_sizes(self.output_effects)]
         for i, oeffect in enumerate(self.output_effects):
             if oeffect.name not in input_names:
                 if oeffect.size:
-                    osize = string_effect_size(
-                        list_effect_size([oeff for oeff in self.output_effects[:i]])
-                    )
+                    osize = osizes[i]
                     offset = "stack_pointer"
                     if isize != osize:
                         if isize != "0":
@@ -341,12 +385,9 @@ def write(self, out: Formatter) -> None:
 
             # Write output stack effect assignments
             oeffects = list(reversed(self.output_effects))
-            for i, oeffect in enumerate(oeffects):
+            for oeffect, osize in zip(oeffects, cumulative_effect_sizes(oeffects)):
                 if oeffect.name in self.unmoved_names:
                     continue
-                osize = string_effect_size(
-                    list_effect_size([oeff for oeff in oeffects[: i + 1]])
-                )
                 if oeffect.size:
                     dst = StackEffect(f"&PEEK({osize})", "PyObject **")
                 else:
@@ -388,7 +429,6 @@ def write_body(self, out: Formatter, dedent: int, cache_adjust: int = 0) -> None
         # Write the body, substituting a goto for ERROR_IF() and other stuff
         assert dedent <= 0
         extra = " " * -dedent
-        names_to_skip = self.unmoved_names | frozenset({UNUSED, "null"})
         for line in self.block_text:
             if m := re.match(r"(\s*)ERROR_IF\((.+), (\w+)\);\s*(?://.*)?$", line):
                 space, cond, label = m.groups()
@@ -396,19 +436,10 @@ def write_body(self, out: Formatter, dedent: int, cache_adjust: int = 0) -> None
                 # ERROR_IF() must pop the inputs from the stack.
                 # The code block is responsible for DECREF()ing them.
                 # NOTE: If the label doesn't exist, just add it to ceval.c.
-                if not self.register:
-                    # Don't pop common input/output effects at the bottom!
-                    # These aren't DECREF'ed so they can stay.
-                    ieffs = list(self.input_effects)
-                    oeffs = list(self.output_effects)
-                    while ieffs and oeffs and ieffs[0] == oeffs[0]:
-                        ieffs.pop(0)
-                        oeffs.pop(0)
-                    ninputs, symbolic = list_effect_size(ieffs)
-                    if ninputs:
-                        label = f"pop_{ninputs}_{label}"
-                else:
-                    symbolic = ""
+                # Register instructions have nothing to pop.
+                ninputs, symbolic = self.error_pop
+                if ninputs:
+                    label = f"pop_{ninputs}_{label}"
                 if symbolic:
                     out.write_raw(
                         f"{space}if ({cond}) {{ STACK_SHRINK({symbolic}); goto {label}; }}\n"
@@ -418,9 +449,7 @@ def write_body(self, out: Formatter, dedent: int, cache_adjust: int = 0) -> None
             elif m := re.match(r"(\s*)DECREF_INPUTS\(\);\s*(?://.*)?$", line):
                 if not self.register:
                     space = extra + m.group(1)
-                    for ieff in self.input_effects:
-                        if ieff.name in names_to_skip:
-                            continue
+                    for ieff in self.decref_effects:
                         if ieff.size:
                             out.write_raw(
                                 f"{space}for (int _i = {ieff.size}; --_i >= 0;) {{\n"
@@ -438,7 +467,7 @@ def write_body(self, out: Formatter, dedent: int, cache_adjust: int = 0) -> None
 StackEffectMapping = list[tuple[StackEffect, StackEffect]]
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Component:
     instr: Instruction
     input_mapping: StackEffectMapping
@@ -459,7 +488,7 @@ def write_body(self, out: Formatter, cache_adjust: int) -> None:
                 out.assign(var, oeffect)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class SuperOrMacroInstruction:
     """Common fields for super- and macro instructions."""
 
@@ -470,7 +499,7 @@ class SuperOrMacroInstruction:
     instr_fmt: str
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class SuperInstruction(SuperOrMacroInstruction):
     """A super-instruction."""
 
@@ -478,7 +507,7 @@ class SuperInstruction(SuperOrMacroInstruction):
     parts: list[Component]
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class MacroInstruction(SuperOrMacroInstruction):
     """A macro instruction."""
 
@@ -511,7 +540,9 @@ def error(self, msg: str, node: parser.Node) -> None:
         lineno = 0
         if context := node.context:
             # Use line number of first non-comment in the node
-            for token in context.owner.tokens[context.begin : context.end]:
+            tokens = context.owner.tokens
+            for i in range(context.begin, context.end):
+                token = tokens[i]
                 lineno = token.line
                 if token.kind != "COMMENT":
                     break
@@ -599,6 +630,8 @@ def find_predictions(self) -> None:
         for instr in self.instrs.values():
             targets = set(instr.predictions)
             for line in instr.block_text:
+                if not line.lstrip().startswith(PREDICTED_PREFIXES):
+                    continue
                 if m := re.match(RE_PREDICTED, line):
                     targets.add(m.group(1))
             for target in targets:
@@ -696,7 +729,7 @@ def effect_counts(self, name: str) -> tuple[int, int, int]:
                     assert isinstance(part, parser.CacheEffect), part
                     cache += part.size
         else:
-            assert False, f"Unknown instruction {name!r}"
+            raise AssertionError(f"Unknown instruction {name!r}")
         return cache, input, output
 
     def analyze_register_instrs(self) -> None:
@@ -772,10 +805,10 @@ def analyze_instruction(
     def check_super_components(self, super: parser.Super) -> list[Instruction]:
         components: list[Instruction] = []
         for op in super.ops:
-            if op.name not in self.instrs:
-                self.error(f"Unknown instruction {op.name!r}", super)
+            if instr := self.instrs.get(op.name):
+                components.append(instr)
             else:
-                components.append(self.instrs[op.name])
+                self.error(f"Unknown instruction {op.name!r}", super)
         return components
 
     def check_macro_components(
@@ -785,9 +818,10 @@ def check_macro_components(
         for uop in macro.uops:
             match uop:
                 case parser.OpName(name):
-                    if name not in self.instrs:
+                    if instr := self.instrs.get(name):
+                        components.append(instr)
+                    else:
                         self.error(f"Unknown instruction {name!r}", macro)
-                    components.append(self.instrs[name])
                 case parser.CacheEffect():
                     components.append(uop)
                 case _:
@@ -836,8 +870,10 @@ def stack_analysis(
     def get_stack_effect_info(
         self, thing: parser.InstDef | parser.Super | parser.Macro
     ) -> tuple[AnyInstruction | None, str, str]:
+        legacy = getattr(thing, "kind", None) == "legacy"
+
         def effect_str(effects: list[StackEffect]) -> str:
-            if getattr(thing, "kind", None) == "legacy":
+            if legacy:
                 return str(-1)
             n_effect, sym_effect = list_effect_size(effects)
             if sym_effect:
@@ -912,18 +948,11 @@ def write_metadata(self) -> None:
         """Write instruction metadata to output file."""
 
         # Compute the set of all instruction formats.
+        # Every InstDef, Super and Macro has an entry in exactly one of
+        # these dicts, so there is no need to dispatch on self.everything.
         all_formats: set[str] = set()
-        for thing in self.everything:
-            match thing:
-                case parser.InstDef():
-                    format = self.instrs[thing.name].instr_fmt
-                case parser.Super():
-                    format = self.super_instrs[thing.name].instr_fmt
-                case parser.Macro():
-                    format = self.macro_instrs[thing.name].instr_fmt
-                case _:
-                    typing.assert_never(thing)
-            all_formats.add(format)
+        for instrs in (self.instrs, self.super_instrs, self.macro_instrs):
+            all_formats.update(instr.instr_fmt for instr in instrs.values())
         # Turn it into a list of enum definitions.
         format_enums = [INSTR_FMT_PREFIX + format for format in sorted(all_formats)]
 
@@ -1187,9 +1216,12 @@ def always_exits(lines: list[str]) -> bool:
 
 def variable_used(node: parser.Node, name: str) -> bool:
     """Determine whether a variable with a given name is used in a node."""
-    return any(
-        token.kind == "IDENTIFIER" and token.text == name for token in node.tokens
-    )
+    # A plain loop avoids a generator round-trip per token;
+    # test the text first since it rarely matches.
+    for token in node.tokens:
+        if token.text == name and token.kind == "IDENTIFIER":
+            return True
+    return False
 
 
 def main():
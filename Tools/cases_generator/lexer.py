@@ -3,6 +3,7 @@
 # https://gist.github.com/markshannon/db7ab649440b5af765451bb77c7dba34
 
 import re
+import string
 import sys
 import collections
 from dataclasses import dataclass
@@ -114,7 +115,8 @@ def choice(*opts):
 newline = r"\n"
 invalid = r"\S"  # A single non-space character that's not caught by any of the other patterns
 matcher = re.compile(choice(id_re, number_re, str_re, char, newline, macro, comment_re, *operators.values(), invalid))
-letter = re.compile(r'[a-zA-Z_]')
+# Characters that can start an identifier (see id_re)
+id_start = frozenset(string.ascii_letters + "_")
 
 kwds = (
     'AUTO', 'BREAK', 'CASE', 'CHAR', 'CONST',
@@ -183,8 +185,10 @@ def tokenize(src, line=1, filename=None):
         text = m.group(0)
         if text in keywords:
             kind = keywords[text]
-        elif letter.match(text):
+        elif text[0] in id_start:
             kind = IDENTIFIER
+            # Identifiers repeat a lot and are compared against literals
+            text = sys.intern(text)
         elif text == '...':
             kind = ELLIPSIS
         elif text == '.':
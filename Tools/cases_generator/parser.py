@@ -10,6 +10,12 @@
 P = TypeVar("P", bound="Parser")
 N = TypeVar("N", bound="Node")
 
+# Token kinds that open or close a nested construct
+OPEN_KINDS = frozenset({lx.LBRACE, lx.LPAREN, lx.LBRACKET})
+CLOSE_KINDS = frozenset({lx.RBRACE, lx.RPAREN, lx.RBRACKET})
+EXPR_OPEN_KINDS = frozenset({lx.LBRACKET, lx.LPAREN})
+EXPR_CLOSE_KINDS = frozenset({lx.RBRACKET, lx.RPAREN})
+
 
 def contextual(func: Callable[[P], N | None]) -> Callable[[P], N | None]:
     # Decorator to wrap grammar methods.
@@ -265,9 +271,9 @@ def expression(self) -> Expression | None:
         tokens: list[lx.Token] = []
         level = 1
         while tkn := self.peek():
-            if tkn.kind in (lx.LBRACKET, lx.LPAREN):
+            if tkn.kind in EXPR_OPEN_KINDS:
                 level += 1
-            elif tkn.kind in (lx.RBRACKET, lx.RPAREN):
+            elif tkn.kind in EXPR_CLOSE_KINDS:
                 level -= 1
                 if level == 0:
                     break
@@ -387,9 +393,9 @@ def c_blob(self) -> list[lx.Token]:
         level = 0
         while tkn := self.next(raw=True):
             tokens.append(tkn)
-            if tkn.kind in (lx.LBRACE, lx.LPAREN, lx.LBRACKET):
+            if tkn.kind in OPEN_KINDS:
                 level += 1
-            elif tkn.kind in (lx.RBRACE, lx.RPAREN, lx.RBRACKET):
+            elif tkn.kind in CLOSE_KINDS:
                 level -= 1
                 if level <= 0:
                     break
@@ -35,6 +35,10 @@ def test_effect_sizes():
     assert generate_cases.string_effect_size(generate_cases.list_effect_size(output_effects)) == "2 + oparg*4"
     assert generate_cases.string_effect_size(generate_cases.list_effect_size(other_effects)) == "2 + (oparg<<1)"
 
+    assert generate_cases.cumulative_effect_sizes(input_effects) == ["1", "1 + oparg", "1 + oparg + oparg*2"]
+    assert generate_cases.cumulative_effect_sizes(other_effects) == ["(oparg<<1)", "1 + (oparg<<1)", "2 + (oparg<<1)"]
+    assert generate_cases.cumulative_effect_sizes([]) == []
+
 
 def run_cases_test(input: str, expected: str):
     temp_input = tempfile.NamedTemporaryFile("w+")
@@ -527,3 +531,34 @@ def test_cond_effect():
         }
     """
     run_cases_test(input, output)
+
+def run_cases_error_test(input: str) -> int:
+    temp_input = tempfile.NamedTemporaryFile("w+")
+    temp_input.write(generate_cases.BEGIN_MARKER)
+    temp_input.write(input)
+    temp_input.write(generate_cases.END_MARKER)
+    temp_input.flush()
+    temp_output = tempfile.NamedTemporaryFile("w+")
+    temp_metadata = tempfile.NamedTemporaryFile("w+")
+    a = generate_cases.Analyzer(temp_input.name, temp_output.name, temp_metadata.name)
+    a.parse()
+    a.analyze()
+    return a.errors
+
+def test_macro_unknown_op():
+    input = """
+        op(A, (--)) {
+            spam();
+        }
+        macro(M) = A + B;
+    """
+    assert run_cases_error_test(input) == 1
+
+def test_super_unknown_op():
+    input = """
+        inst(A, (--)) {
+            spam();
+        }
+        super(S) = A + B;
+    """
+    assert run_cases_error_test(input) == 1